@@ -62,9 +62,13 @@ export PORT
 echo "[INFO] Using port: $PORT"
 kill_port $PORT
 
-# Start Gunicorn with the correct syntax
-echo "[INFO] Starting Gunicorn server on port $PORT..."
-gunicorn --bind 0.0.0.0:$PORT test_api_server:app &
+# Start Gunicorn with a single threaded worker: all data lives in process memory,
+# so extra worker processes would each serve their own copy. The gthread worker
+# also keeps client connections alive between requests (the sync worker does not);
+# the app guards its in-memory store and response cache with locks.
+THREADS=${THREADS:-8}
+echo "[INFO] Starting Gunicorn server on port $PORT ($THREADS threads)..."
+gunicorn --bind 0.0.0.0:$PORT --worker-class gthread --workers 1 --threads $THREADS --keep-alive 30 test_api_server:app &
 GUNICORN_PID=$!
 
 # Wait for Gunicorn to start
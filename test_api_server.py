@@ -1,39 +1,198 @@
-from flask import Flask, jsonify, request, abort, send_from_directory
+from flask import Flask, Response, jsonify, request, abort, send_from_directory
+from flask.json.provider import JSONProvider
 from flask_compress import Compress
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
+from flask_caching.backends import SimpleCache
 from functools import wraps
-import json
 import re
 from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
 import uuid
-from collections import defaultdict
+import base64
+import bisect
+import hashlib
+import hmac
+import threading
+import time
+from collections import Counter, defaultdict
+from itertools import islice
 from flask import Blueprint
+import orjson
 
 
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson; keys are sorted to match Flask's default output"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, option=self.option).decode()
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=self.option), mimetype="application/json")
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
+app.config['COMPRESS_STREAMS'] = False  # Buffering to compress would defeat streamed responses
 Compress(app)  # Enable compression
 
-# Rate Limiting Configuration
+# Rate Limiting Configuration (in-process storage, sliding-window-counter accounting)
 limiter = Limiter(
     get_remote_address,
     app=app,
     default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
+    storage_uri="memory://",
+    strategy="sliding-window-counter"  # O(1) state per key; no per-hit timestamps
 )
 
+class LockedSimpleCache(SimpleCache):
+    """
+    SimpleCache shared safely by server threads. Pruning iterates the whole
+    store, so every access takes the same lock.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            return super().get(key)
+
+    def set(self, key, value, timeout=None):
+        with self._lock:
+            return super().set(key, value, timeout)
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            return super().add(key, value, timeout)
+
+    def delete(self, key):
+        with self._lock:
+            return super().delete(key)
+
+    def has(self, key):
+        with self._lock:
+            return super().has(key)
+
+    def clear(self):
+        with self._lock:
+            return super().clear()
+
 # Cache Configuration
 cache = Cache(app, config={
-    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_TYPE': f'{__name__}.LockedSimpleCache',
     'CACHE_DEFAULT_TIMEOUT': 300  # 5 minutes
 })
 
+# Per-namespace cache versions. Writes bump the version of the data they touch,
+# so cached responses built from it stop matching, while unrelated entries stay
+# warm. Keys issued under each current version are recorded and deleted on the
+# bump, so superseded responses don't fill the cache until their TTL and make
+# every set prune.
+_CACHE_VERSIONS: Dict[str, int] = {'organizations': 0, 'users': 0, 'profiles': 0}
+_CACHE_KEYS: Dict[str, set] = {namespace: set() for namespace in _CACHE_VERSIONS}
+_CACHE_KEYS_LOCK = threading.Lock()
+
+def invalidate_cache(namespace: str) -> None:
+    with _CACHE_KEYS_LOCK:
+        _CACHE_VERSIONS[namespace] += 1
+        stale, _CACHE_KEYS[namespace] = _CACHE_KEYS[namespace], set()
+    for key in stale:
+        cache.delete(key)
+
+def cache_version(*namespaces: str) -> str:
+    return ':'.join(f"{namespace}{_CACHE_VERSIONS[namespace]}" for namespace in namespaces)
+
+def _record_cache_key(key: Any, namespaces: Tuple[str, ...]) -> None:
+    """Record a key under its namespaces; call with _CACHE_KEYS_LOCK held"""
+    for namespace in namespaces:
+        keys = _CACHE_KEYS[namespace]
+        keys.add(key)
+        # Read-only traffic never bumps the version, so once the record outgrows
+        # the cache, drop keys the cache has already pruned or expired
+        if len(keys) > 2 * cache.cache._threshold:
+            _CACHE_KEYS[namespace] = {live for live in keys if cache.has(live)}
+
+def versioned_cache_key(*namespaces: str):
+    """Build a make_cache_key for @cache.cached from the request and namespace versions"""
+    def make_cache_key(*args, **kwargs) -> str:
+        query = sorted(request.args.items(multi=True))
+        with _CACHE_KEYS_LOCK:
+            key = f"{request.path}_{query}_{cache_version(*namespaces)}"
+            _record_cache_key(key, namespaces)
+        return key
+    return make_cache_key
+
+def list_cache_key(namespace: str, page: int, per_page: int, filters: Dict[str, str]) -> Tuple:
+    """Cache key for a paginated list GET (SimpleCache accepts any hashable key)"""
+    with _CACHE_KEYS_LOCK:
+        key = (namespace, _CACHE_VERSIONS[namespace], page, per_page, tuple(sorted(filters.items())))
+        _record_cache_key(key, (namespace,))
+    return key
+
+def search_cache_key(*args, **kwargs) -> str:
+    """Key advanced search results on the versions of the entity types they can contain"""
+    entity_type = request.args.get('type', 'all')
+    namespaces = (entity_type,) if entity_type in _CACHE_VERSIONS else tuple(_CACHE_VERSIONS)
+    return versioned_cache_key(*namespaces)()
+
+def _is_write_request() -> bool:
+    return request.method != 'GET'
+
 # Security
 BEARER_TOKEN = "ft_test_api_2024"
 
+# Metadata version stamped on newly created entities
+_META_VERSION = "1.0.0"
+
+# Formatted date and time of the most recent second seen by utc_now_iso
+_ISO_SECOND: Tuple[int, str] = (0, "1970-01-01T00:00:00")
+
+def utc_now_iso() -> str:
+    """Current UTC time formatted like datetime.utcnow().isoformat()"""
+    global _ISO_SECOND
+    seconds, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _ISO_SECOND
+    if seconds != cached_second:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _ISO_SECOND = (seconds, prefix)
+    return f"{prefix}.{micros:06d}" if micros else prefix
+
+# Allowed organization types; the message keeps the documented order
+_ORG_TYPE_CHOICES = ('test', 'enterprise', 'startup', 'nonprofit', 'government')
+_VALID_ORG_TYPES = frozenset(_ORG_TYPE_CHOICES)
+_VALID_ORG_TYPES_STR = ', '.join(_ORG_TYPE_CHOICES)
+
+# Precompiled validation patterns; emails are split on '@' and each half
+# matched separately so neither pattern can backtrack across the other
+_EMAIL_MAX_LENGTH = 254  # RFC 5321 path limit
+_EMAIL_LOCAL_RE = re.compile(r'[a-zA-Z0-9._%+-]+')
+_EMAIL_DOMAIN_RE = re.compile(r'[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+def _valid_email(email: str) -> bool:
+    local, sep, domain = email.rpartition('@')
+    return bool(sep) and _EMAIL_LOCAL_RE.fullmatch(local) is not None and _EMAIL_DOMAIN_RE.fullmatch(domain) is not None
+
 # Validation Functions
+def _valid_id(value: Any, prefix: str, min_digits: int = 3, anchored: bool = True) -> bool:
+    """
+    Check that value is a prefix followed by at least min_digits digits.
+    When anchored is False, anything may follow the leading digits (e.g. 'USER001_001').
+    """
+    if not isinstance(value, str) or not value.startswith(prefix):
+        return False
+    start = len(prefix)
+    if len(value) < start + min_digits:
+        return False
+    if anchored:
+        return value[start:].isdecimal()
+    return value[start:start + min_digits].isdecimal()
+
 def validate_json_payload(data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
     """Validate that the request has valid JSON payload"""
     if not data:
@@ -42,16 +201,18 @@ def validate_json_payload(data: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
 
 def validate_organization_data(data: Dict[str, Any], is_update: bool = False) -> Tuple[bool, Optional[str]]:
     """Validate organization data with comprehensive checks"""
+    name = data.get('name')
+    org_type = data.get('type')
+    
     # Check required fields for creation
     if not is_update:
-        if not data.get('name'):
+        if not name:
             return False, "Field 'name' is required and cannot be empty"
-        if not data.get('type'):
+        if not org_type:
             return False, "Field 'type' is required and cannot be empty"
     
     # Validate name if provided
     if 'name' in data:
-        name = data['name']
         if not isinstance(name, str) or len(name.strip()) == 0:
             return False, "Field 'name' must be a non-empty string"
         if len(name) > 100:
@@ -59,31 +220,30 @@ def validate_organization_data(data: Dict[str, Any], is_update: bool = False) ->
     
     # Validate type if provided
     if 'type' in data:
-        org_type = data['type']
-        valid_types = ['test', 'enterprise', 'startup', 'nonprofit', 'government']
-        if not isinstance(org_type, str) or org_type not in valid_types:
-            return False, f"Field 'type' must be one of: {', '.join(valid_types)}"
+        if not isinstance(org_type, str) or org_type not in _VALID_ORG_TYPES:
+            return False, f"Field 'type' must be one of: {_VALID_ORG_TYPES_STR}"
     
     # Validate ID format if provided
     if 'id' in data:
-        org_id = data['id']
-        if not isinstance(org_id, str) or not re.match(r'^ORG\d{3,}$', org_id):
+        if not _valid_id(data['id'], 'ORG'):
             return False, "Field 'id' must follow format 'ORG###' (e.g., 'ORG001', 'ORG123')"
     
     return True, None
 
 def validate_user_data(data: Dict[str, Any], is_update: bool = False, exclude_user_id: str = None) -> Tuple[bool, Optional[str]]:
     """Validate user data with comprehensive checks"""
+    name = data.get('name')
+    email = data.get('email')
+    
     # Check required fields for creation
     if not is_update:
-        if not data.get('name'):
+        if not name:
             return False, "Field 'name' is required and cannot be empty"
-        if not data.get('email'):
+        if not email:
             return False, "Field 'email' is required and cannot be empty"
     
     # Validate name if provided
     if 'name' in data:
-        name = data['name']
         if not isinstance(name, str) or len(name.strip()) == 0:
             return False, "Field 'name' must be a non-empty string"
         if len(name) > 100:
@@ -91,42 +251,42 @@ def validate_user_data(data: Dict[str, Any], is_update: bool = False, exclude_us
     
     # Validate email if provided
     if 'email' in data:
-        email = data['email']
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not isinstance(email, str) or not re.match(email_pattern, email):
+        if not isinstance(email, str):
+            return False, "Field 'email' must be a valid email address"
+        if len(email) > _EMAIL_MAX_LENGTH:
+            return False, f"Field 'email' must be {_EMAIL_MAX_LENGTH} characters or less"
+        if not _valid_email(email):
             return False, "Field 'email' must be a valid email address"
         
         # Check for duplicate email (excluding current user in updates)
-        existing_user = next((user for user in SAMPLE_USERS if user["email"] == email and user["id"] != exclude_user_id), None)
-        if existing_user:
+        existing_user = USER_BY_EMAIL.get(email)
+        if existing_user and existing_user["id"] != exclude_user_id:
             return False, f"Email '{email}' is already in use by another user"
     
     # Validate organization_id if provided
-    if 'organization_id' in data:
-        org_id = data['organization_id']
-        if org_id:  # Allow None/empty for optional field
-            existing_org = next((org for org in SAMPLE_ORGANIZATIONS if org["id"] == org_id), None)
-            if not existing_org:
-                return False, f"Organization with ID '{org_id}' does not exist"
+    org_id = data.get('organization_id')
+    if org_id not in (None, ''):  # Allow None/empty for optional field
+        if not isinstance(org_id, str) or org_id not in ORG_BY_ID:
+            return False, f"Organization with ID '{org_id}' does not exist"
     
     # Validate ID format if provided
     if 'id' in data:
-        user_id = data['id']
-        if not isinstance(user_id, str) or not re.match(r'^USER\d{3,}', user_id):
+        if not _valid_id(data['id'], 'USER', anchored=False):
             return False, "Field 'id' must follow format 'USER###' (e.g., 'USER001', 'USER123')"
     
     return True, None
 
 def validate_profile_data(data: Dict[str, Any], is_update: bool = False) -> Tuple[bool, Optional[str]]:
     """Validate profile data with comprehensive checks"""
+    name = data.get('name')
+    
     # Check required fields for creation
     if not is_update:
-        if not data.get('name'):
+        if not name:
             return False, "Field 'name' is required and cannot be empty"
     
     # Validate name if provided
     if 'name' in data:
-        name = data['name']
         if not isinstance(name, str) or len(name.strip()) == 0:
             return False, "Field 'name' must be a non-empty string"
         if len(name) > 100:
@@ -134,39 +294,33 @@ def validate_profile_data(data: Dict[str, Any], is_update: bool = False) -> Tupl
     
     # Validate settings if provided
     if 'settings' in data:
-        settings = data['settings']
-        if not isinstance(settings, dict):
+        if not isinstance(data['settings'], dict):
             return False, "Field 'settings' must be a valid JSON object"
     
     # Validate preferences if provided
     if 'preferences' in data:
-        preferences = data['preferences']
-        if not isinstance(preferences, dict):
+        if not isinstance(data['preferences'], dict):
             return False, "Field 'preferences' must be a valid JSON object"
     
     # Validate ID format if provided
     if 'id' in data:
-        profile_id = data['id']
-        if not isinstance(profile_id, str) or not re.match(r'^PROF\d{3,}', profile_id):
+        if not _valid_id(data['id'], 'PROF', anchored=False):
             return False, "Field 'id' must follow format 'PROF###' (e.g., 'PROF001', 'PROF123')"
     
     return True, None
 
 def check_duplicate_id(entity_type: str, entity_id: str, exclude_id: str = None) -> Tuple[bool, Optional[str]]:
     """Check for duplicate IDs across all entity types"""
-    collections = {
-        'organization': SAMPLE_ORGANIZATIONS,
-        'user': SAMPLE_USERS,
-        'profile': SAMPLE_PROFILES
+    indexes = {
+        'organization': ORG_BY_ID,
+        'user': USER_BY_ID,
+        'profile': PROFILE_BY_ID
     }
     
-    if entity_type not in collections:
+    if entity_type not in indexes:
         return False, f"Invalid entity type: {entity_type}"
     
-    collection = collections[entity_type]
-    existing_entity = next((item for item in collection if item["id"] == entity_id and item["id"] != exclude_id), None)
-    
-    if existing_entity:
+    if entity_id in indexes[entity_type] and entity_id != exclude_id:
         return False, f"{entity_type.capitalize()} with ID '{entity_id}' already exists"
     
     return True, None
@@ -208,12 +362,22 @@ def require_token(f):
             return jsonify({"error": "Missing or invalid Authorization header"}), 401
         
         token = auth_header.split(' ')[1]
-        if token != BEARER_TOKEN:
+        if not hmac.compare_digest(token.encode(), BEARER_TOKEN.encode()):
             return jsonify({"error": "Invalid token"}), 401
         
         return f(*args, **kwargs)
     return decorated
 
+def serialize_writes(f):
+    """Run non-GET requests under STORE_LOCK so check-then-insert steps cannot interleave"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if request.method == 'GET':
+            return f(*args, **kwargs)
+        with STORE_LOCK:
+            return f(*args, **kwargs)
+    return decorated
+
 # Helper function to create nested profile with 10 levels
 def create_nested_profile(level: int = 10) -> Dict[str, Any]:
     if level == 1:
@@ -234,6 +398,10 @@ def create_nested_profile(level: int = 10) -> Dict[str, Any]:
         }
     }
 
+# Shared, read-only nested tree referenced by every sample profile. Handlers
+# only ever replace top-level keys on a profile, never mutate it in place.
+_PROFILE_TEMPLATE = create_nested_profile()
+
 # Helper function to create sample data
 def create_sample_data():
     organizations = []
@@ -257,10 +425,8 @@ def create_sample_data():
         # Create 10 users per organization
         for j in range(1, 11):
             user_id = f"USER{i:03d}_{j:03d}"
-            profile = create_nested_profile()
             profile_id = f"PROF{i:03d}_{j:03d}"
-            profile["id"] = profile_id
-            profiles.append(profile)
+            profiles.append({**_PROFILE_TEMPLATE, "id": profile_id})
             
             users.append({
                 "id": user_id,
@@ -280,6 +446,244 @@ def create_sample_data():
 # Create sample data
 SAMPLE_ORGANIZATIONS, SAMPLE_USERS, SAMPLE_PROFILES = create_sample_data()
 
+# Lookup indexes over the sample data, kept in sync by the helpers below
+ORG_BY_ID: Dict[str, Dict[str, Any]] = {org["id"]: org for org in SAMPLE_ORGANIZATIONS}
+USER_BY_ID: Dict[str, Dict[str, Any]] = {user["id"]: user for user in SAMPLE_USERS}
+PROFILE_BY_ID: Dict[str, Dict[str, Any]] = {profile["id"]: profile for profile in SAMPLE_PROFILES}
+USER_BY_EMAIL: Dict[str, Dict[str, Any]] = {user["email"]: user for user in SAMPLE_USERS}
+USERS_BY_ORG: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+for _user in SAMPLE_USERS:
+    USERS_BY_ORG[_user["organization_id"]].append(_user)
+ORG_TYPE_COUNTS: Counter = Counter(org["type"] for org in SAMPLE_ORGANIZATIONS)
+
+# Guards SAMPLE_* and every index over them under threaded workers. Write
+# requests hold it from validation through insertion (see serialize_writes),
+# and readers hold it while walking index dicts or lists.
+STORE_LOCK = threading.RLock()
+
+# Grouping indexes that filter_data can narrow filters through, by result tag
+_FILTER_INDEXES = {'user': {'organization_id': USERS_BY_ORG}}
+
+def _build_blob(item: Dict[str, Any]) -> str:
+    """
+    Lowercase all string values of an item into one NUL-separated haystack,
+    so a text search is a single substring test per item.
+    Walks nested dicts/lists with an explicit stack rather than recursion.
+    """
+    parts: List[str] = []
+    stack: List[Any] = [item]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, str):
+            parts.append(current.lower())
+        elif isinstance(current, dict):
+            stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return "\0".join(parts)
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# Search haystacks keyed by entity ID, plus a trigram -> entity IDs index over
+# them; both are rebuilt whenever an entity changes
+_SEARCH_BLOB: Dict[str, str] = {}
+TRIGRAM_INDEX: Dict[str, set] = defaultdict(set)
+
+# Lowercased text of each entity's scalar fields, for filter matching: entity ID ->
+# (entity, {field: text}), where nested fields are keyed by their path tuple
+_FIELD_TEXT: Dict[str, Tuple[Dict[str, Any], Dict[Any, str]]] = {}
+
+def _build_field_text(item: Dict[str, Any]) -> Dict[Any, str]:
+    fields: Dict[Any, str] = {}
+    stack: List[Tuple[Tuple[str, ...], Dict[str, Any]]] = [((), item)]
+    while stack:
+        path, current = stack.pop()
+        for key, value in current.items():
+            if isinstance(value, dict):
+                stack.append(((*path, key), value))
+            elif not isinstance(value, list):
+                fields[(*path, key) if path else key] = str(value).lower()
+    return fields
+
+def _discard_postings(entity_id: str, trigrams: set) -> None:
+    for trigram in trigrams:
+        postings = TRIGRAM_INDEX.get(trigram)
+        if postings is not None:
+            postings.discard(entity_id)
+            if not postings:
+                del TRIGRAM_INDEX[trigram]
+
+def drop_search_blob(entity_id: str) -> None:
+    _FIELD_TEXT.pop(entity_id, None)
+    blob = _SEARCH_BLOB.pop(entity_id, None)
+    if blob is not None:
+        _discard_postings(entity_id, _trigrams(blob))
+
+def refresh_search_blob(item: Dict[str, Any]) -> None:
+    """
+    Rebuild an entity's search entries without a window where they are missing:
+    the new blob replaces the old one in a single assignment, postings for new
+    trigrams are added before it and stale ones are removed only after it.
+    """
+    entity_id = item["id"]
+    field_text = _build_field_text(item)
+    blob = _build_blob(item)
+    old_blob = _SEARCH_BLOB.get(entity_id)
+    trigrams = _trigrams(blob)
+    old_trigrams = _trigrams(old_blob) if old_blob is not None else set()
+    for trigram in trigrams - old_trigrams:
+        TRIGRAM_INDEX[trigram].add(entity_id)
+    _FIELD_TEXT[entity_id] = (item, field_text)
+    _SEARCH_BLOB[entity_id] = blob
+    _discard_postings(entity_id, old_trigrams - trigrams)
+
+for _item in (*SAMPLE_ORGANIZATIONS, *SAMPLE_USERS, *SAMPLE_PROFILES):
+    refresh_search_blob(_item)
+
+def search_candidates(query_lower: str) -> Optional[set]:
+    """
+    IDs of entities whose haystack contains every trigram of the query; a
+    superset of the real matches. None when the query is too short to narrow.
+    """
+    if len(query_lower) < 3:
+        return None
+    postings = []
+    for trigram in _trigrams(query_lower):
+        ids = TRIGRAM_INDEX.get(trigram)
+        if not ids:
+            return set()
+        postings.append(ids)
+    postings.sort(key=len)
+    candidates = set(postings[0])
+    for ids in postings[1:]:
+        candidates &= ids
+        if not candidates:
+            break
+    return candidates
+
+def _decrement_org_type(org_type: str) -> None:
+    ORG_TYPE_COUNTS[org_type] -= 1
+    if ORG_TYPE_COUNTS[org_type] <= 0:
+        del ORG_TYPE_COUNTS[org_type]
+
+def _seed_sequence(prefix: str, items: List[Dict[str, Any]]) -> int:
+    """Start past the collection size and any purely numeric IDs already in use"""
+    seq = len(items)
+    for item in items:
+        suffix = item["id"][len(prefix):]
+        if suffix.isdecimal():
+            seq = max(seq, int(suffix))
+    return seq
+
+# Last auto-generated sequence number per ID prefix
+_ID_SEQ: Dict[str, int] = {
+    'ORG': _seed_sequence('ORG', SAMPLE_ORGANIZATIONS),
+    'USER': _seed_sequence('USER', SAMPLE_USERS),
+    'PROF': _seed_sequence('PROF', SAMPLE_PROFILES)
+}
+
+def next_id(prefix: str, index: Dict[str, Any], reserved: Any = ()) -> str:
+    """
+    Allocate the next auto-generated ID for a prefix, skipping IDs already taken.
+    reserved holds extra IDs claimed but not yet indexed (e.g. earlier ops in a batch).
+    Callers hold STORE_LOCK through insertion (see serialize_writes), so the ID
+    stays free until it is indexed; taking it here again is reentrant.
+    """
+    with STORE_LOCK:
+        seq = _ID_SEQ[prefix] + 1
+        while f"{prefix}{seq:03d}" in index or f"{prefix}{seq:03d}" in reserved:
+            seq += 1
+        _ID_SEQ[prefix] = seq
+    return f"{prefix}{seq:03d}"
+
+# Entity IDs kept in sorted order for keyset (cursor) pagination
+SORTED_IDS: Dict[str, List[str]] = {
+    'organization': sorted(ORG_BY_ID),
+    'user': sorted(USER_BY_ID),
+    'profile': sorted(PROFILE_BY_ID)
+}
+
+def _insert_sorted_id(entity_type: str, entity_id: str) -> None:
+    bisect.insort(SORTED_IDS[entity_type], entity_id)
+
+def _remove_sorted_id(entity_type: str, entity_id: str) -> None:
+    ids = SORTED_IDS[entity_type]
+    i = bisect.bisect_left(ids, entity_id)
+    if i < len(ids) and ids[i] == entity_id:
+        del ids[i]
+
+def add_organization(org: Dict[str, Any]) -> None:
+    add_organizations([org])
+
+# Entities are indexed before they join their SAMPLE_* list and leave the list
+# before their index entries go, so anything reachable from a list is indexed
+
+def add_organizations(orgs: List[Dict[str, Any]]) -> None:
+    for org in orgs:
+        ORG_BY_ID[org["id"]] = org
+        ORG_TYPE_COUNTS[org["type"]] += 1
+        refresh_search_blob(org)
+        _insert_sorted_id('organization', org["id"])
+    SAMPLE_ORGANIZATIONS.extend(orgs)
+
+def remove_organization(org: Dict[str, Any]) -> None:
+    SAMPLE_ORGANIZATIONS.remove(org)
+    ORG_BY_ID.pop(org["id"], None)
+    _decrement_org_type(org["type"])
+    drop_search_blob(org["id"])
+    _remove_sorted_id('organization', org["id"])
+
+def update_organization_type(org: Dict[str, Any], org_type: str) -> None:
+    """Keep the per-type counts in step when an organization's type changes"""
+    # Count the new type first: it is the only step that can fail (unhashable type)
+    ORG_TYPE_COUNTS[org_type] += 1
+    _decrement_org_type(org["type"])
+    org["type"] = org_type
+
+def add_user(user: Dict[str, Any]) -> None:
+    USER_BY_ID[user["id"]] = user
+    USER_BY_EMAIL[user["email"]] = user
+    USERS_BY_ORG[user["organization_id"]].append(user)
+    refresh_search_blob(user)
+    _insert_sorted_id('user', user["id"])
+    SAMPLE_USERS.append(user)
+
+def remove_user(user: Dict[str, Any]) -> None:
+    SAMPLE_USERS.remove(user)
+    USER_BY_ID.pop(user["id"], None)
+    if USER_BY_EMAIL.get(user["email"]) is user:
+        del USER_BY_EMAIL[user["email"]]
+    USERS_BY_ORG[user["organization_id"]].remove(user)
+    drop_search_blob(user["id"])
+    _remove_sorted_id('user', user["id"])
+
+def update_user_email(user: Dict[str, Any], email: str) -> None:
+    """Re-key the email index when a user's email changes"""
+    if USER_BY_EMAIL.get(user["email"]) is user:
+        del USER_BY_EMAIL[user["email"]]
+    user["email"] = email
+    USER_BY_EMAIL[email] = user
+
+def update_user_organization(user: Dict[str, Any], org_id: Optional[str]) -> None:
+    """Move a user between organization buckets when its organization changes"""
+    # Join the new bucket first: it is the only step that can fail (unhashable ID)
+    USERS_BY_ORG[org_id].append(user)
+    USERS_BY_ORG[user["organization_id"]].remove(user)
+    user["organization_id"] = org_id
+
+def add_profile(profile: Dict[str, Any]) -> None:
+    PROFILE_BY_ID[profile["id"]] = profile
+    refresh_search_blob(profile)
+    _insert_sorted_id('profile', profile["id"])
+    SAMPLE_PROFILES.append(profile)
+
+def remove_profile(profile: Dict[str, Any]) -> None:
+    SAMPLE_PROFILES.remove(profile)
+    PROFILE_BY_ID.pop(profile["id"], None)
+    drop_search_blob(profile["id"])
+    _remove_sorted_id('profile', profile["id"])
+
 # Helper functions for pagination and filtering
 def paginate_data(data: List[Any], page: int = 1, per_page: int = 10) -> Dict[str, Any]:
     start_idx = (page - 1) * per_page
@@ -292,46 +696,106 @@ def paginate_data(data: List[Any], page: int = 1, per_page: int = 10) -> Dict[st
         "total_pages": (len(data) + per_page - 1) // per_page
     }
 
+def paginate_tagged(segments: List[Tuple[str, List[Any]]], page: int = 1, per_page: int = 10) -> Dict[str, Any]:
+    """
+    Paginate the concatenation of (type tag, matches) segments like paginate_data,
+    copying only the requested page's items to add their 'type' tag.
+    """
+    total = sum(len(matches) for _, matches in segments)
+    start_idx = (page - 1) * per_page
+    start, stop, _ = slice(start_idx, start_idx + per_page).indices(total)
+    tagged = ((item, tag) for tag, matches in segments for item in matches)
+    return {
+        "items": [{**item, 'type': tag} for item, tag in islice(tagged, start, max(start, stop))],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page
+    }
+
 # Enhanced filter function with nested field support and text search
-def filter_data(data: List[Any], filters: Dict[str, Any]) -> List[Any]:
+def filter_data(data: List[Any], filters: Dict[str, Any],
+                indexes: Optional[Dict[str, Dict[Any, List[Any]]]] = None) -> List[Any]:
     """
     Filter data based on provided filters dictionary.
     Supports nested field filtering using dot notation (e.g., "metadata.version").
+    Filters on keys in indexes (key -> {field value: items}) are narrowed through them first.
     """
-    filtered = data
-    for key, value in filters.items():
-        if '.' in key:
-            # Handle nested field filtering
-            filtered = [item for item in filtered if _get_nested_value(item, key, value)]
-        else:
-            # Handle top-level field filtering
-            filtered = [item for item in filtered if str(_get_field_value(item, key)).lower().find(str(value).lower()) != -1]
-    return filtered
+    if not filters:
+        return data
+    prepared = _prepare_filters(filters)
+    allowed = None
+    if indexes:
+        allowed, prepared = _index_candidates(prepared, indexes, len(data))
+    if allowed is None:
+        return [item for item in data if _item_matches_filters(item, prepared)]
+    if not allowed:
+        return []
+    return [item for item in data if item["id"] in allowed and _item_matches_filters(item, prepared)]
 
-def _get_nested_value(item: Dict[str, Any], key_path: str, search_value: str) -> bool:
+def _index_candidates(prepared: List[Tuple[Any, str]], indexes: Dict[str, Dict[Any, List[Any]]],
+                      limit: int) -> Tuple[Optional[set], List[Tuple[Any, str]]]:
     """
-    Get value from nested dictionary using dot notation.
-    Returns True if the search_value is found in the nested field.
+    IDs of items whose indexed filter fields contain the filter values, found by
+    testing each distinct field value once, and the filters still to check per item.
+    A filter matching every field value is dropped; one matching over half of
+    limit rows is left to the plain scan. IDs are None when nothing was narrowed.
     """
-    keys = key_path.split('.')
-    current = item
-    
-    try:
-        for key in keys:
-            if isinstance(current, dict) and key in current:
-                current = current[key]
-            else:
+    allowed = None
+    remaining = []
+    for key, value_lower in prepared:
+        index = indexes.get(key) if isinstance(key, str) and value_lower else None
+        if index is None:
+            remaining.append((key, value_lower))
+            continue
+        with STORE_LOCK:
+            groups = [items for field_value, items in index.items() if value_lower in str(field_value).lower()]
+            if len(groups) == len(index):
+                continue
+            remaining.append((key, value_lower))
+            if sum(map(len, groups)) * 2 > limit:
+                continue
+            ids = {item["id"] for items in groups for item in items}
+        allowed = ids if allowed is None else allowed & ids
+    return allowed, remaining
+
+def _prepare_filters(filters: Dict[str, Any]) -> List[Tuple[Any, str]]:
+    """
+    Lowercase filter values and split dot-notation keys once per request.
+    Nested keys become a tuple of path segments; top-level keys stay strings.
+    """
+    return [(tuple(key.split('.')) if '.' in key else key, str(value).lower()) for key, value in filters.items()]
+
+def _item_matches_filters(item: Dict[str, Any], prepared: List[Tuple[Any, str]]) -> bool:
+    snapshot = _FIELD_TEXT.get(item.get("id"))
+    field_text = snapshot[1] if snapshot is not None and snapshot[0] is item else {}
+    for key, value_lower in prepared:
+        text = field_text.get(key)
+        if text is not None:
+            # Pre-lowered scalar field, top-level or nested
+            if value_lower not in text:
                 return False
-        
-        return str(current).lower().find(str(search_value).lower()) != -1
-    except:
-        return False
+        elif isinstance(key, tuple):
+            # Handle nested field filtering
+            if not _get_nested_value(item, key, value_lower):
+                return False
+        elif value_lower not in str(item.get(key, '')).lower():
+            # Handle top-level field filtering
+            return False
+    return True
 
-def _get_field_value(item: Dict[str, Any], key: str) -> str:
+def _get_nested_value(item: Dict[str, Any], keys: Tuple[str, ...], value_lower: str) -> bool:
     """
-    Get field value with fallback to empty string.
+    Get value from nested dictionary using pre-split dot-notation keys.
+    Returns True if the already-lowercased value is found in the nested field.
     """
-    return str(item.get(key, ''))
+    current = item
+    for key in keys:
+        if isinstance(current, dict) and key in current:
+            current = current[key]
+        else:
+            return False
+    return value_lower in str(current).lower()
 
 def search_in_text(data: List[Any], query: str) -> List[Any]:
     """
@@ -342,92 +806,142 @@ def search_in_text(data: List[Any], query: str) -> List[Any]:
         return data
     
     query_lower = query.lower()
-    results = []
-    
-    for item in data:
-        if _item_matches_query(item, query_lower):
-            results.append(item)
-    
-    return results
+    return match_text(data, query_lower, search_candidates(query_lower))
+
+def match_text(data: List[Any], query_lower: str, candidates: Optional[set]) -> List[Any]:
+    """search_in_text with the lowercased query and its search_candidates already computed"""
+    # A reader may still hold an entity that a concurrent delete has unindexed
+    blobs = _SEARCH_BLOB
+    if candidates is None:
+        return [item for item in data if query_lower in blobs.get(item["id"], "")]
+    # Verify trigram candidates with a real substring test
+    return [item for item in data if item["id"] in candidates and query_lower in blobs.get(item["id"], "")]
+
+# Entity types in advanced search order: (type parameter, result tag, id index)
+_SEARCH_ENTITIES = (
+    ('organizations', 'organization', ORG_BY_ID),
+    ('users', 'user', USER_BY_ID),
+    ('profiles', 'profile', PROFILE_BY_ID)
+)
+_SEARCH_ENTITY_RANK = {tag: rank for rank, (_, tag, _) in enumerate(_SEARCH_ENTITIES)}
+
+# Entity types covered by each accepted 'type' parameter; unknown types cover none
+_SEARCH_TYPE_SCOPES = {
+    'all': frozenset(plural for plural, _, _ in _SEARCH_ENTITIES),
+    **{plural: frozenset((plural,)) for plural, _, _ in _SEARCH_ENTITIES}
+}
 
-def _item_matches_query(item: Any, query_lower: str) -> bool:
+def encode_cursor(entity_type: str, entity_id: str) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps({"type": entity_type, "id": entity_id})).decode()
+
+def decode_cursor(cursor: str) -> Optional[Tuple[str, str]]:
+    """Decode an opaque search cursor into (result tag, id); None if malformed"""
+    try:
+        position = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        return None
+    if (not isinstance(position, dict) or position.get("type") not in _SEARCH_ENTITY_RANK
+            or not isinstance(position.get("id"), str)):
+        return None
+    return position["type"], position["id"]
+
+def keyset_search(entity_type: str, query: str, filters: Dict[str, Any], per_page: int,
+                  after: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
     """
-    Check if an item matches the search query by searching all string fields.
+    Return the next per_page matches ordered by (entity type, id), starting after
+    the given cursor position. Only the requested page is scanned and copied,
+    so deep pages cost the same as the first one.
     """
-    if isinstance(item, dict):
-        for key, value in item.items():
-            if isinstance(value, str) and query_lower in value.lower():
-                return True
-            elif isinstance(value, (dict, list)):
-                if _item_matches_query(value, query_lower):
-                    return True
-    elif isinstance(item, list):
-        for sub_item in item:
-            if _item_matches_query(sub_item, query_lower):
-                return True
-    elif isinstance(item, str):
-        return query_lower in item.lower()
-    
-    return False
+    query_lower = query.lower()
+    candidates = search_candidates(query_lower)
+    prepared = _prepare_filters(filters)
+    items = []
+    last = None
+    after_rank = _SEARCH_ENTITY_RANK[after[0]] if after else -1
+    scope = _SEARCH_TYPE_SCOPES.get(entity_type, frozenset())
+    
+    # Hold the store lock so SORTED_IDS and the indexes cannot change mid-scan
+    with STORE_LOCK:
+        for rank, (plural, tag, index) in enumerate(_SEARCH_ENTITIES):
+            if plural not in scope or rank < after_rank:
+                continue
+            ids = SORTED_IDS[tag]
+            start = bisect.bisect_right(ids, after[1]) if rank == after_rank else 0
+            for i in range(start, len(ids)):
+                entity_id = ids[i]
+                if candidates is not None and entity_id not in candidates:
+                    continue
+                if query_lower and query_lower not in _SEARCH_BLOB[entity_id]:
+                    continue
+                item = index[entity_id]
+                if prepared and not _item_matches_filters(item, prepared):
+                    continue
+                if len(items) == per_page:
+                    # One more match exists past this page
+                    return {"items": items, "per_page": per_page, "next_cursor": encode_cursor(*last)}
+                items.append({**item, 'type': tag})
+                last = (tag, entity_id)
+    
+    return {"items": items, "per_page": per_page, "next_cursor": None}
+
+# Static payloads are serialized once at import time
+_ROOT_BODY = orjson.dumps({
+    "api": "Test API",
+    "version": "1.0.0",
+    "status": "running",
+    "endpoints": {
+        "organizations": "/api/organizations",
+        "users": "/api/users",
+        "organization": "/api/organizations/{id}",
+        "user": "/api/user/{id}",
+        "search": "/api/search",
+        "health": "/api/health",
+        "version": "/api/version",
+        "profiles": "/api/profiles",
+        "stats": "/api/stats",
+        "batch": "/api/batch"
+    }
+}, option=OrjsonProvider.option)
+
+_VERSION_BODY = orjson.dumps({
+    "version": "1.0.0",
+    "build": "2024.1.0",
+    "environment": "development"
+}, option=OrjsonProvider.option)
 
 # Root endpoint
 @app.route('/')
 @limiter.limit("10 per minute")  # Stricter limit for root endpoint
-@cache.cached(timeout=60)  # Cache for 1 minute
 def root():
-    return jsonify({
-        "api": "Test API",
-        "version": "1.0.0",
-        "status": "running",
-        "endpoints": {
-            "organizations": "/api/organizations",
-            "users": "/api/users",
-            "organization": "/api/organizations/{id}",
-            "user": "/api/user/{id}",
-            "search": "/api/search",
-            "health": "/api/health",
-            "version": "/api/version",
-            "profiles": "/api/profiles",
-            "stats": "/api/stats",
-            "batch": "/api/batch"
-        }
-    })
+    return Response(_ROOT_BODY, mimetype='application/json')
+
+# Health body around its timestamp, matching the sorted-key encoding of
+# {"status": "healthy", "timestamp": ..., "version": "1.0.0"}
+_HEALTH_PREFIX = b'{"status":"healthy","timestamp":"'
+_HEALTH_SUFFIX = b'","version":"1.0.0"}'
 
 # Health check endpoint
 @app.route('/api/health')
 @limiter.limit("30 per minute")
-@cache.cached(timeout=30)  # Cache for 30 seconds
 def health_check():
-    return jsonify({
-        "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
-        "version": "1.0.0"
-    })
+    return Response(_HEALTH_PREFIX + utc_now_iso().encode() + _HEALTH_SUFFIX, mimetype='application/json')
 
 # Version endpoint
 @app.route('/api/version')
 @limiter.limit("30 per minute")
-@cache.cached(timeout=300)  # Cache for 5 minutes
 def version():
-    return jsonify({
-        "version": "1.0.0",
-        "build": "2024.1.0",
-        "environment": "development"
-    })
+    return Response(_VERSION_BODY, mimetype='application/json')
 
 # Organizations endpoints
 @app.route('/api/organizations', methods=['GET', 'POST'])
 @require_token
 @limiter.limit("100 per minute")
+@serialize_writes
 def handle_organizations():
     if request.method == 'POST':
-        # Clear all cached GET responses when data is modified
-        cache.clear()
-        
         # Get and validate JSON payload
-        try:
-            data = request.get_json()
-        except Exception:
+        data = request.get_json(silent=True)
+        if data is None:
             return jsonify({"error": "Invalid JSON in request body"}), 400
         
         # Validate JSON payload
@@ -450,22 +964,21 @@ def handle_organizations():
             org_id = provided_id
         else:
             # Auto-generate ID
-            org_id = f"ORG{len(SAMPLE_ORGANIZATIONS) + 1:03d}"
-            # Ensure auto-generated ID doesn't conflict
-            while any(org["id"] == org_id for org in SAMPLE_ORGANIZATIONS):
-                org_id = f"ORG{len(SAMPLE_ORGANIZATIONS) + 2:03d}"
+            org_id = next_id('ORG', ORG_BY_ID)
         
+        now = utc_now_iso()
         new_org = {
             "id": org_id,
             "name": data['name'],
             "type": data['type'],
             "metadata": {
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
-                "version": "1.0.0"
+                "created_at": now,
+                "updated_at": now,
+                "version": _META_VERSION
             }
         }
-        SAMPLE_ORGANIZATIONS.append(new_org)
+        add_organization(new_org)
+        invalidate_cache('organizations')
         return jsonify(new_org), 201
     
     # GET request - Create cache key based on all query parameters
@@ -474,69 +987,75 @@ def handle_organizations():
     filters = {k: v for k, v in request.args.items() if k not in ['page', 'per_page']}
     
     # Create a consistent cache key
-    cache_key = f"organizations_page_{page}_per_page_{per_page}_filters_{sorted(filters.items())}"
+    cache_key = list_cache_key('organizations', page, per_page, filters)
     
-    # Try to get from cache first
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        return jsonify(cached_result)
+    # Try to get the encoded response from cache first
+    cached_body = cache.get(cache_key)
+    if cached_body is not None:
+        return Response(cached_body, mimetype='application/json')
     
     # Generate response
     filtered_orgs = filter_data(SAMPLE_ORGANIZATIONS, filters)
-    result = paginate_data(filtered_orgs, page, per_page)
+    body = orjson.dumps(paginate_data(filtered_orgs, page, per_page), option=OrjsonProvider.option)
     
-    # Cache the result for 60 seconds
-    cache.set(cache_key, result, timeout=60)
+    # Cache the encoded result for 60 seconds
+    cache.set(cache_key, body, timeout=60)
     
-    return jsonify(result)
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/organizations/<org_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_token
 @limiter.limit("100 per minute")
-@cache.cached(timeout=60, query_string=True)  # Cache GET requests
+@cache.cached(timeout=60, unless=_is_write_request,
+              make_cache_key=versioned_cache_key('organizations', 'users'))  # Cache GET requests
+@serialize_writes
 def handle_organization(org_id):
-    org = next((org for org in SAMPLE_ORGANIZATIONS if org["id"] == org_id), None)
+    org = ORG_BY_ID.get(org_id)
     if not org:
         return jsonify({"error": "Organization not found"}), 404
     
-    if request.method in ['PUT', 'DELETE']:
-        cache.clear()  # Clear all cache on modification
-    
     if request.method == 'DELETE':
-        SAMPLE_ORGANIZATIONS.remove(org)
+        remove_organization(org)
+        invalidate_cache('organizations')
         return '', 204
     
     if request.method == 'PUT':
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON in request body"}), 400
+        
+        # Validate before touching the record or its indexes
+        is_valid, error_msg = validate_organization_data(data, is_update=True)
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+        
+        if data.get('type', org['type']) != org['type']:
+            update_organization_type(org, data['type'])
         org.update({
             "name": data.get('name', org['name']),
-            "type": data.get('type', org['type']),
             "metadata": {
                 **org['metadata'],
-                "updated_at": datetime.utcnow().isoformat()
+                "updated_at": utc_now_iso()
             }
         })
+        refresh_search_blob(org)
+        invalidate_cache('organizations')
         return jsonify(org)
     
     # GET request
-    org_users = [user for user in SAMPLE_USERS if user["organization_id"] == org_id]
-    org["users"] = org_users
-    org["total_users"] = len(org_users)
-    return jsonify(org)
+    org_users = USERS_BY_ORG.get(org_id, [])
+    return jsonify({**org, "users": org_users, "total_users": len(org_users)})
 
 # Users endpoints
 @app.route('/api/users', methods=['GET', 'POST'])
 @require_token
 @limiter.limit("100 per minute")
+@serialize_writes
 def handle_users():
     if request.method == 'POST':
-        # Clear all cached GET responses when data is modified
-        cache.clear()
-        
         # Get and validate JSON payload
-        try:
-            data = request.get_json()
-        except Exception:
+        data = request.get_json(silent=True)
+        if data is None:
             return jsonify({"error": "Invalid JSON in request body"}), 400
         
         # Validate JSON payload
@@ -559,11 +1078,9 @@ def handle_users():
             user_id = provided_id
         else:
             # Auto-generate ID
-            user_id = f"USER{len(SAMPLE_USERS) + 1:03d}"
-            # Ensure auto-generated ID doesn't conflict
-            while any(user["id"] == user_id for user in SAMPLE_USERS):
-                user_id = f"USER{len(SAMPLE_USERS) + 2:03d}"
+            user_id = next_id('USER', USER_BY_ID)
         
+        now = utc_now_iso()
         new_user = {
             "id": user_id,
             "name": data['name'],
@@ -571,12 +1088,13 @@ def handle_users():
             "organization_id": data.get('organization_id'),
             "profile_id": f"PROF{len(SAMPLE_PROFILES) + 1:03d}",
             "metadata": {
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
-                "version": "1.0.0"
+                "created_at": now,
+                "updated_at": now,
+                "version": _META_VERSION
             }
         }
-        SAMPLE_USERS.append(new_user)
+        add_user(new_user)
+        invalidate_cache('users')
         return jsonify(new_user), 201
     
     # GET request - Create cache key based on all query parameters
@@ -585,69 +1103,77 @@ def handle_users():
     filters = {k: v for k, v in request.args.items() if k not in ['page', 'per_page']}
     
     # Create a consistent cache key
-    cache_key = f"users_page_{page}_per_page_{per_page}_filters_{sorted(filters.items())}"
+    cache_key = list_cache_key('users', page, per_page, filters)
     
-    # Try to get from cache first
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        return jsonify(cached_result)
+    # Try to get the encoded response from cache first
+    cached_body = cache.get(cache_key)
+    if cached_body is not None:
+        return Response(cached_body, mimetype='application/json')
     
     # Generate response
-    filtered_users = filter_data(SAMPLE_USERS, filters)
-    result = paginate_data(filtered_users, page, per_page)
+    filtered_users = filter_data(SAMPLE_USERS, filters, _FILTER_INDEXES['user'])
+    body = orjson.dumps(paginate_data(filtered_users, page, per_page), option=OrjsonProvider.option)
     
-    # Cache the result for 60 seconds
-    cache.set(cache_key, result, timeout=60)
+    # Cache the encoded result for 60 seconds
+    cache.set(cache_key, body, timeout=60)
     
-    return jsonify(result)
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/users/<user_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_token
 @limiter.limit("100 per minute")
+@serialize_writes
 def handle_user(user_id):
-    user = next((user for user in SAMPLE_USERS if user["id"] == user_id), None)
+    user = USER_BY_ID.get(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
     
-    if request.method in ['PUT', 'DELETE']:
-        cache.clear()  # Clear all cache on modification
-    
     if request.method == 'DELETE':
-        SAMPLE_USERS.remove(user)
+        remove_user(user)
+        invalidate_cache('users')
         return '', 204
     
     if request.method == 'PUT':
-        data = request.get_json()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Invalid JSON in request body"}), 400
+        
+        # Validate before touching the record or its indexes
+        is_valid, error_msg = validate_user_data(data, is_update=True, exclude_user_id=user_id)
+        if not is_valid:
+            return jsonify({"error": error_msg}), 400
+        
+        if data.get('email', user['email']) != user['email']:
+            update_user_email(user, data['email'])
+        if data.get('organization_id', user['organization_id']) != user['organization_id']:
+            update_user_organization(user, data['organization_id'])
         user.update({
             "name": data.get('name', user['name']),
-            "email": data.get('email', user['email']),
-            "organization_id": data.get('organization_id', user['organization_id']),
             "metadata": {
                 **user['metadata'],
-                "updated_at": datetime.utcnow().isoformat()
+                "updated_at": utc_now_iso()
             }
         })
+        refresh_search_blob(user)
+        invalidate_cache('users')
         return jsonify(user)
     
     # GET request
-    org = next((org for org in SAMPLE_ORGANIZATIONS if org["id"] == user["organization_id"]), None)
+    org = ORG_BY_ID.get(user["organization_id"])
     if org:
-        user["organization"] = org
+        return jsonify({**user, "organization": org})
     return jsonify(user)
 
 # Profile endpoints
 @app.route('/api/profiles', methods=['GET', 'POST'])
 @require_token
 @limiter.limit("100 per minute")
+@serialize_writes
 def handle_profiles():
     if request.method == 'POST':
-        # Clear all cached GET responses when data is modified
-        cache.clear()
-        
         # Get and validate JSON payload
-        try:
-            data = request.get_json()
-        except Exception:
+        data = request.get_json(silent=True)
+        if data is None:
             return jsonify({"error": "Invalid JSON in request body"}), 400
         
         # Validate JSON payload
@@ -670,23 +1196,22 @@ def handle_profiles():
             profile_id = provided_id
         else:
             # Auto-generate ID
-            profile_id = f"PROF{len(SAMPLE_PROFILES) + 1:03d}"
-            # Ensure auto-generated ID doesn't conflict
-            while any(profile["id"] == profile_id for profile in SAMPLE_PROFILES):
-                profile_id = f"PROF{len(SAMPLE_PROFILES) + 2:03d}"
+            profile_id = next_id('PROF', PROFILE_BY_ID)
         
+        now = utc_now_iso()
         new_profile = {
             "id": profile_id,
             "name": data['name'],
             "settings": data.get('settings', {}),
             "preferences": data.get('preferences', {}),
             "metadata": {
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat(),
-                "version": "1.0.0"
+                "created_at": now,
+                "updated_at": now,
+                "version": _META_VERSION
             }
         }
-        SAMPLE_PROFILES.append(new_profile)
+        add_profile(new_profile)
+        invalidate_cache('profiles')
         return jsonify(new_profile), 201
     
     # GET request - Create cache key based on all query parameters
@@ -695,35 +1220,34 @@ def handle_profiles():
     filters = {k: v for k, v in request.args.items() if k not in ['page', 'per_page']}
     
     # Create a consistent cache key
-    cache_key = f"profiles_page_{page}_per_page_{per_page}_filters_{sorted(filters.items())}"
+    cache_key = list_cache_key('profiles', page, per_page, filters)
     
-    # Try to get from cache first
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        return jsonify(cached_result)
+    # Try to get the encoded response from cache first
+    cached_body = cache.get(cache_key)
+    if cached_body is not None:
+        return Response(cached_body, mimetype='application/json')
     
     # Generate response
     filtered_profiles = filter_data(SAMPLE_PROFILES, filters)
-    result = paginate_data(filtered_profiles, page, per_page)
+    body = orjson.dumps(paginate_data(filtered_profiles, page, per_page), option=OrjsonProvider.option)
     
-    # Cache the result for 60 seconds
-    cache.set(cache_key, result, timeout=60)
+    # Cache the encoded result for 60 seconds
+    cache.set(cache_key, body, timeout=60)
     
-    return jsonify(result)
+    return Response(body, mimetype='application/json')
 
 @app.route('/api/profiles/<profile_id>', methods=['GET', 'PUT', 'DELETE'])
 @require_token
 @limiter.limit("100 per minute")
+@serialize_writes
 def handle_profile(profile_id):
-    profile = next((p for p in SAMPLE_PROFILES if p["id"] == profile_id), None)
+    profile = PROFILE_BY_ID.get(profile_id)
     if not profile:
         return jsonify({"error": "Profile not found"}), 404
     
-    if request.method in ['PUT', 'DELETE']:
-        cache.clear()  # Clear all cache on modification
-    
     if request.method == 'DELETE':
-        SAMPLE_PROFILES.remove(profile)
+        remove_profile(profile)
+        invalidate_cache('profiles')
         return '', 204
     
     if request.method == 'PUT':
@@ -734,9 +1258,11 @@ def handle_profile(profile_id):
             "preferences": data.get('preferences', profile.get('preferences', {})),
             "metadata": {
                 **profile.get('metadata', {}),
-                "updated_at": datetime.utcnow().isoformat()
+                "updated_at": utc_now_iso()
             }
         })
+        refresh_search_blob(profile)
+        invalidate_cache('profiles')
         return jsonify(profile)
     
     return jsonify(profile)
@@ -745,27 +1271,22 @@ def handle_profile(profile_id):
 @app.route('/api/stats')
 @require_token
 @limiter.limit("30 per minute")
-@cache.cached(timeout=300)  # Cache for 5 minutes
+@cache.cached(timeout=300, make_cache_key=versioned_cache_key('organizations', 'users', 'profiles'))  # Cache for 5 minutes
 def get_stats():
-    stats = {
-        "organizations": {
-            "total": len(SAMPLE_ORGANIZATIONS),
-            "by_type": defaultdict(int)
-        },
-        "users": {
-            "total": len(SAMPLE_USERS),
-            "by_organization": defaultdict(int)
-        },
-        "profiles": {
-            "total": len(SAMPLE_PROFILES)
+    with STORE_LOCK:
+        stats = {
+            "organizations": {
+                "total": len(SAMPLE_ORGANIZATIONS),
+                "by_type": dict(ORG_TYPE_COUNTS)
+            },
+            "users": {
+                "total": len(SAMPLE_USERS),
+                "by_organization": {org_id: len(users) for org_id, users in USERS_BY_ORG.items() if users}
+            },
+            "profiles": {
+                "total": len(SAMPLE_PROFILES)
+            }
         }
-    }
-    
-    for org in SAMPLE_ORGANIZATIONS:
-        stats["organizations"]["by_type"][org["type"]] += 1
-    
-    for user in SAMPLE_USERS:
-        stats["users"]["by_organization"][user["organization_id"]] += 1
     
     return jsonify(stats)
 
@@ -773,11 +1294,11 @@ def get_stats():
 @app.route('/api/batch/organizations', methods=['POST'])
 @require_token
 @limiter.limit("20 per minute")  # Stricter limit for batch operations
+@serialize_writes
 def batch_organizations():
     # Get and validate JSON payload
-    try:
-        data = request.get_json()
-    except Exception:
+    data = request.get_json(silent=True)
+    if data is None:
         return jsonify({"error": "Invalid JSON in request body"}), 400
     
     # Validate JSON payload
@@ -792,6 +1313,9 @@ def batch_organizations():
         return jsonify({"error": error_msg}), 400
     
     results = []
+    new_orgs = []
+    pending_ids = set()  # IDs claimed by earlier operations in this batch
+    now = utc_now_iso()
     
     for i, op in enumerate(operations):
         if op['action'] == 'create':
@@ -805,47 +1329,49 @@ def batch_organizations():
                 # Handle ID assignment and duplicate checking
                 provided_id = op['data'].get('id')
                 if provided_id:
-                    # Check for duplicate ID
+                    # Check for duplicate ID, including IDs earlier in this batch
                     is_valid, error_msg = check_duplicate_id('organization', provided_id)
+                    if is_valid and provided_id in pending_ids:
+                        is_valid, error_msg = False, f"Organization with ID '{provided_id}' already exists"
                     if not is_valid:
                         results.append({"status": "error", "error": f"Operation {i+1}: {error_msg}"})
                         continue
                     org_id = provided_id
                 else:
                     # Auto-generate ID
-                    org_id = f"ORG{len(SAMPLE_ORGANIZATIONS) + 1:03d}"
-                    # Ensure auto-generated ID doesn't conflict
-                    while any(org["id"] == org_id for org in SAMPLE_ORGANIZATIONS):
-                        org_id = f"ORG{len(SAMPLE_ORGANIZATIONS) + 2:03d}"
+                    org_id = next_id('ORG', ORG_BY_ID, pending_ids)
                 
                 new_org = {
                     "id": org_id,
                     "name": op['data']['name'],
                     "type": op['data']['type'],
                     "metadata": {
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "version": "1.0.0"
+                        "created_at": now,
+                        "updated_at": now,
+                        "version": _META_VERSION
                     }
                 }
-                SAMPLE_ORGANIZATIONS.append(new_org)
+                pending_ids.add(org_id)
+                new_orgs.append(new_org)
                 results.append({"status": "success", "data": new_org})
             except Exception as e:
                 results.append({"status": "error", "error": f"Operation {i+1}: {str(e)}"})
     
-    # Clear relevant caches
-    cache.clear()
+    # Insert all created organizations at once and invalidate cached responses built from them
+    if new_orgs:
+        add_organizations(new_orgs)
+        invalidate_cache('organizations')
     
     return jsonify({"results": results})
 
 @app.route('/api/batch/users', methods=['POST'])
 @require_token
 @limiter.limit("20 per minute")  # Stricter limit for batch operations
+@serialize_writes
 def batch_users():
     # Get and validate JSON payload
-    try:
-        data = request.get_json()
-    except Exception:
+    data = request.get_json(silent=True)
+    if data is None:
         return jsonify({"error": "Invalid JSON in request body"}), 400
     
     # Validate JSON payload
@@ -859,60 +1385,70 @@ def batch_users():
     if not is_valid:
         return jsonify({"error": error_msg}), 400
     
-    results = []
-    
-    for i, op in enumerate(operations):
-        if op['action'] == 'create':
-            try:
-                # Validate user data
-                is_valid, error_msg = validate_user_data(op['data'])
-                if not is_valid:
-                    results.append({"status": "error", "error": f"Operation {i+1}: {error_msg}"})
-                    continue
-                
-                # Handle ID assignment and duplicate checking
-                provided_id = op['data'].get('id')
-                if provided_id:
-                    # Check for duplicate ID
-                    is_valid, error_msg = check_duplicate_id('user', provided_id)
-                    if not is_valid:
-                        results.append({"status": "error", "error": f"Operation {i+1}: {error_msg}"})
-                        continue
-                    user_id = provided_id
-                else:
-                    # Auto-generate ID
-                    user_id = f"USER{len(SAMPLE_USERS) + 1:03d}"
-                    # Ensure auto-generated ID doesn't conflict
-                    while any(user["id"] == user_id for user in SAMPLE_USERS):
-                        user_id = f"USER{len(SAMPLE_USERS) + 2:03d}"
-                
-                new_user = {
-                    "id": user_id,
-                    "name": op['data']['name'],
-                    "email": op['data']['email'],
-                    "organization_id": op['data'].get('organization_id'),
-                    "profile_id": f"PROF{len(SAMPLE_PROFILES) + 1:03d}",
-                    "metadata": {
-                        "created_at": datetime.utcnow().isoformat(),
-                        "updated_at": datetime.utcnow().isoformat(),
-                        "version": "1.0.0"
-                    }
-                }
-                SAMPLE_USERS.append(new_user)
-                results.append({"status": "success", "data": new_user})
-            except Exception as e:
-                results.append({"status": "error", "error": f"Operation {i+1}: {str(e)}"})
-    
-    # Clear relevant caches
-    cache.clear()
-    
-    return jsonify({"results": results})
+    # Apply the whole batch before responding, so how much of it takes effect
+    # never depends on how much of the response the client reads
+    now = utc_now_iso()
+    results = [_create_batch_user(i, op['data'], now)
+               for i, op in enumerate(operations) if op['action'] == 'create']
+    
+    # Invalidate cached responses built from users once the batch has run
+    if any(result["status"] == "success" for result in results):
+        invalidate_cache('users')
+    
+    def generate_results():
+        # Encode the results one at a time instead of as one large body
+        yield b'{"results":['
+        dumps, option = orjson.dumps, OrjsonProvider.option
+        separator = b''
+        for result in results:
+            yield separator + dumps(result, option=option)
+            separator = b','
+        yield b']}'
+    
+    return Response(generate_results(), mimetype='application/json')
+
+def _create_batch_user(i: int, user_data: Dict[str, Any], now: str) -> Dict[str, Any]:
+    """Create one user from a batch operation and return its result entry"""
+    try:
+        # Validate user data
+        is_valid, error_msg = validate_user_data(user_data)
+        if not is_valid:
+            return {"status": "error", "error": f"Operation {i+1}: {error_msg}"}
+        
+        # Handle ID assignment and duplicate checking
+        provided_id = user_data.get('id')
+        if provided_id:
+            # Check for duplicate ID
+            is_valid, error_msg = check_duplicate_id('user', provided_id)
+            if not is_valid:
+                return {"status": "error", "error": f"Operation {i+1}: {error_msg}"}
+            user_id = provided_id
+        else:
+            # Auto-generate ID
+            user_id = next_id('USER', USER_BY_ID)
+        
+        new_user = {
+            "id": user_id,
+            "name": user_data['name'],
+            "email": user_data['email'],
+            "organization_id": user_data.get('organization_id'),
+            "profile_id": f"PROF{len(SAMPLE_PROFILES) + 1:03d}",
+            "metadata": {
+                "created_at": now,
+                "updated_at": now,
+                "version": _META_VERSION
+            }
+        }
+        add_user(new_user)
+        return {"status": "success", "data": new_user}
+    except Exception as e:
+        return {"status": "error", "error": f"Operation {i+1}: {str(e)}"}
 
 # Advanced search endpoint
 @app.route('/api/search/advanced')
 @require_token
 @limiter.limit("50 per minute")  # Stricter limit for search
-@cache.cached(timeout=60, query_string=True)  # Cache search results
+@cache.cached(timeout=60, make_cache_key=search_cache_key)  # Cache search results
 def advanced_search():
     query = request.args.get('q', '')
     entity_type = request.args.get('type', 'all')
@@ -921,49 +1457,48 @@ def advanced_search():
     filters = request.args.get('filters', '{}')
     
     try:
-        filters = json.loads(filters)
-    except:
+        filters = orjson.loads(filters)
+    except orjson.JSONDecodeError:
+        filters = {}
+    if not isinstance(filters, dict):
         filters = {}
     
-    results = []
-    
-    # Apply search and filtering to organizations
-    if entity_type in ['all', 'organizations']:
-        org_data = SAMPLE_ORGANIZATIONS
-        
-        # Apply text search first if query is provided
-        if query:
-            org_data = search_in_text(org_data, query)
-        
-        # Apply filters
-        org_results = filter_data(org_data, filters)
-        results.extend([{**org, 'type': 'organization'} for org in org_results])
+    # Cursor pagination: pass an empty 'cursor' for the first page, then 'next_cursor'
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        if per_page < 1:
+            return jsonify({"error": "Field 'per_page' must be at least 1"}), 400
+        after = None
+        if cursor:
+            after = decode_cursor(cursor)
+            if after is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+        return jsonify(keyset_search(entity_type, query, filters, per_page, after))
+    
+    # Narrow the query through the trigram index once for all entity types, and
+    # skip types that have no candidates at all (a keys view tests disjointness
+    # by walking the smaller side, where set.isdisjoint(dict) walks every ID)
+    query_lower = query.lower()
+    candidates = search_candidates(query_lower) if query else None
     
-    # Apply search and filtering to users
-    if entity_type in ['all', 'users']:
-        user_data = SAMPLE_USERS
-        
-        # Apply text search first if query is provided
-        if query:
-            user_data = search_in_text(user_data, query)
-        
-        # Apply filters
-        user_results = filter_data(user_data, filters)
-        results.extend([{**user, 'type': 'user'} for user in user_results])
+    # Apply search and filtering to each requested entity type
+    scope = _SEARCH_TYPE_SCOPES.get(entity_type, frozenset())
+    segments = [
+        (tag, _search_entity(data, query_lower, candidates, filters, _FILTER_INDEXES.get(tag)))
+        for (plural, tag, index), data in zip(_SEARCH_ENTITIES, (SAMPLE_ORGANIZATIONS, SAMPLE_USERS, SAMPLE_PROFILES))
+        if plural in scope and (candidates is None or not index.keys().isdisjoint(candidates))
+    ]
     
-    # Apply search and filtering to profiles
-    if entity_type in ['all', 'profiles']:
-        profile_data = SAMPLE_PROFILES
-        
-        # Apply text search first if query is provided
-        if query:
-            profile_data = search_in_text(profile_data, query)
-        
-        # Apply filters
-        profile_results = filter_data(profile_data, filters)
-        results.extend([{**profile, 'type': 'profile'} for profile in profile_results])
-    
-    return jsonify(paginate_data(results, page, per_page))
+    return jsonify(paginate_tagged(segments, page, per_page))
+
+def _search_entity(data: List[Any], query_lower: str, candidates: Optional[set], filters: Dict[str, Any],
+                   indexes: Optional[Dict[str, Dict[Any, List[Any]]]] = None) -> List[Any]:
+    # Apply text search first if query is provided
+    if query_lower:
+        data = match_text(data, query_lower, candidates)
+    
+    # Apply filters
+    return filter_data(data, filters, indexes)
 
 # --- OpenAPI/Swagger Documentation ---
 openapi_spec = {
@@ -1378,6 +1913,12 @@ openapi_spec = {
                         "description": "Page number for pagination. Defaults to 1.",
                         "example": 1
                     },
+                    {
+                        "name": "cursor", 
+                        "in": "query", 
+                        "schema": {"type": "string"},
+                        "description": "Opaque cursor for keyset pagination. Pass an empty value for the first page, then the previous response's 'next_cursor'. When present, 'page' is ignored and the response carries 'next_cursor' instead of totals."
+                    },
                     {
                         "name": "per_page", 
                         "in": "query", 
@@ -1401,7 +1942,8 @@ openapi_spec = {
                                         "total": {"type": "integer", "description": "Total number of matching items"},
                                         "page": {"type": "integer", "description": "Current page number"},
                                         "per_page": {"type": "integer", "description": "Items per page"},
-                                        "total_pages": {"type": "integer", "description": "Total number of pages"}
+                                        "total_pages": {"type": "integer", "description": "Total number of pages"},
+                                        "next_cursor": {"type": "string", "nullable": True, "description": "Cursor for the next page (cursor pagination only); null on the last page"}
                                     }
                                 }
                             }
@@ -1573,14 +2115,27 @@ openapi_spec = {
     }
 }
 
+def static_response(body: bytes, etag: str, mimetype: str) -> Response:
+    """Serve a pre-encoded static body, answering a matching If-None-Match with 304"""
+    # Compression suffixes the ETag (e.g. ":gzip"), so compare the base tag
+    not_modified = any(tag.partition(':')[0] == etag for tag in request.if_none_match.as_set())
+    response = Response(b'' if not_modified else body, status=304 if not_modified else 200,
+                        mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
+
+# The spec is static, so encode it once and let clients revalidate with the ETag
+_OPENAPI_BODY = orjson.dumps(openapi_spec, option=OrjsonProvider.option)
+_OPENAPI_ETAG = hashlib.md5(_OPENAPI_BODY, usedforsecurity=False).hexdigest()
+
 @app.route('/api/openapi.json')
 def openapi_json():
-    return jsonify(openapi_spec)
+    return static_response(_OPENAPI_BODY, _OPENAPI_ETAG, 'application/json')
 
-@app.route('/api/docs')
-def swagger_ui():
-    # Serve Swagger UI using the online CDN and point it to /api/openapi.json
-    html = '''
+# Swagger UI page, loaded from the online CDN and pointed at /api/openapi.json
+_SWAGGER_UI_BODY = '''
     <!DOCTYPE html>
     <html>
     <head>
@@ -1598,8 +2153,12 @@ def swagger_ui():
       </script>
     </body>
     </html>
-    '''
-    return html
+    '''.encode()
+_SWAGGER_UI_ETAG = hashlib.md5(_SWAGGER_UI_BODY, usedforsecurity=False).hexdigest()
+
+@app.route('/api/docs')
+def swagger_ui():
+    return static_response(_SWAGGER_UI_BODY, _SWAGGER_UI_ETAG, 'text/html')
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=3000) 
\ No newline at end of file
@@ -5,6 +5,14 @@ class TestAPIUser(HttpUser):
     wait_time = between(1, 3)
     token = "ft_test_api_2024"
     
+    # Request URLs built once rather than formatted on every task run
+    org_urls = [f'/api/organizations/ORG{i:03d}' for i in range(1, 11)]
+    nested_urls = [
+        f'{url}/headquarters/address/coordinates/geographic/region/classification/population/density/measurement/conversion'
+        for url in org_urls
+    ]
+    filtered_org_urls = [f'/api/organizations?type={org_type}' for org_type in ('enterprise', 'startup')]
+    
     def on_start(self):
         """Set up headers for all requests"""
         self.headers = {
@@ -19,24 +27,17 @@ class TestAPIUser(HttpUser):
     @task(2)
     def get_specific_organization(self):
         """Test getting a specific organization"""
-        org_id = f"ORG{random.randint(1, 10):03d}"
-        self.client.get(f'/api/organizations/{org_id}', headers=self.headers)
+        self.client.get(random.choice(self.org_urls), headers=self.headers)
     
     @task(1)
     def get_filtered_organizations(self):
         """Test getting filtered organizations"""
-        org_types = ['enterprise', 'startup']
-        org_type = random.choice(org_types)
-        self.client.get(f'/api/organizations?type={org_type}', headers=self.headers)
+        self.client.get(random.choice(self.filtered_org_urls), headers=self.headers)
     
     @task(1)
     def get_nested_data(self):
         """Test getting deeply nested data"""
-        org_id = f"ORG{random.randint(1, 10):03d}"
-        self.client.get(
-            f'/api/organizations/{org_id}/headquarters/address/coordinates/geographic/region/classification/population/density/measurement/conversion',
-            headers=self.headers
-        )
+        self.client.get(random.choice(self.nested_urls), headers=self.headers)
     
     @task(1)
     def health_check(self):
@@ -1,11 +1,14 @@
 import pytest
-from test_api_server import app
+from test_api_server import app, cache, limiter
 import json
+import threading
 import unittest
 import requests
+from werkzeug.test import EnvironBuilder
 
-@pytest.fixture
+@pytest.fixture(scope='module')
 def client():
+    # Shared across the module: limiter and data state live on the app, not the client
     app.config['TESTING'] = True
     with app.test_client() as client:
         yield client
@@ -78,9 +81,10 @@ def test_get_nested_data(client):
 def test_rate_limiting(client):
     """Test rate limiting"""
     headers = {'Authorization': 'Bearer ft_test_api_2024'}
-    # Make multiple requests in quick succession
+    # Make multiple requests in quick succession, straight through the WSGI app
+    environ = EnvironBuilder('/api/organizations', headers=headers).get_environ()
     for _ in range(60):
-        response = client.get('/api/organizations', headers=headers)
+        app.wsgi_app(environ.copy(), lambda status, response_headers, exc_info=None: None).close()
     # The 51st request should be rate limited
     response = client.get('/api/organizations', headers=headers)
     assert response.status_code == 429
@@ -101,37 +105,193 @@ def test_malformed_auth_header(client):
     data = json.loads(response.data)
     assert 'error' in data
 
+def test_batch_users_streamed_results(client):
+    """Test the streamed batch users response body"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    operations = [
+        {'action': 'create', 'data': {'name': 'Batch User', 'email': 'batch.stream@example.com'}},
+        {'action': 'create', 'data': {'name': 'Bad Email', 'email': 'not-an-email'}},
+        {'action': 'delete', 'data': {}}
+    ]
+    response = client.post('/api/batch/users', json={'operations': operations}, headers=headers)
+    assert response.status_code == 200
+    assert response.is_streamed
+    results = json.loads(response.data)['results']
+    assert len(results) == 2
+    assert results[0]['status'] == 'success'
+    assert results[0]['data']['email'] == 'batch.stream@example.com'
+    assert results[1]['status'] == 'error'
+    assert results[1]['error'].startswith('Operation 2:')
+    response = client.get(f"/api/users/{results[0]['data']['id']}", headers=headers)
+    assert response.status_code == 200
+    # The batch is applied even if the client never reads the body
+    operations = [{'action': 'create', 'data': {'name': 'Unread', 'email': 'batch.unread@example.com'}}]
+    environ = EnvironBuilder('/api/batch/users', method='POST', json={'operations': operations},
+                             headers=headers).get_environ()
+    app.wsgi_app(environ, lambda status, response_headers, exc_info=None: None).close()
+    response = client.get('/api/users?email=batch.unread@example.com', headers=headers)
+    assert [user['name'] for user in response.get_json()['items']] == ['Unread']
+
+def test_update_user_duplicate_email(client):
+    """Test that a user update cannot take another user's email"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    taken = client.get('/api/users/USER010_010', headers=headers).get_json()['email']
+    response = client.put('/api/users/USER010_009', json={'email': taken}, headers=headers)
+    assert response.status_code == 400
+    assert 'already in use' in json.loads(response.data)['error']
+    assert client.get('/api/users/USER010_009', headers=headers).get_json()['email'] != taken
+    # The email is still reserved for its owner
+    response = client.post('/api/users', json={'name': 'Copy', 'email': taken}, headers=headers)
+    assert response.status_code == 400
+
+def test_update_organization_invalid_type(client):
+    """Test that an invalid organization update leaves the record and stats intact"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    before = client.get('/api/organizations/ORG002', headers=headers).get_json()['type']
+    response = client.put('/api/organizations/ORG002', json={'type': ['a']}, headers=headers)
+    assert response.status_code == 400
+    assert client.get('/api/organizations/ORG002', headers=headers).get_json()['type'] == before
+    stats = client.get('/api/stats', headers=headers).get_json()['organizations']
+    assert sum(stats['by_type'].values()) == stats['total']
+
+def test_update_user_invalid_organization(client):
+    """Test that an invalid organization_id update leaves the user in its organization"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    for org_id in (['a'], [], 'ORG999'):
+        response = client.put('/api/users/USER010_008', json={'organization_id': org_id}, headers=headers)
+        assert response.status_code == 400
+    org_users = client.get('/api/organizations/ORG010', headers=headers).get_json()['users']
+    assert 'USER010_008' in [user['id'] for user in org_users]
+
+def test_advanced_search_cursor_invalid_per_page(client):
+    """Test that cursor pagination rejects a non-positive page size"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    for per_page in (0, -1):
+        response = client.get(f'/api/search/advanced?cursor=&per_page={per_page}', headers=headers)
+        assert response.status_code == 400
+
+def test_openapi_json_not_modified(client):
+    """Test that the OpenAPI spec revalidates with its ETag, compressed or not"""
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        response = client.get('/api/openapi.json', headers=headers)
+        assert response.status_code == 200
+        etag = response.headers['ETag']
+        response = client.get('/api/openapi.json', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+def test_api_docs_not_modified(client):
+    """Test that the Swagger UI page revalidates with its ETag, compressed or not"""
+    for headers in ({}, {'Accept-Encoding': 'gzip'}):
+        response = client.get('/api/docs', headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/html'
+        etag = response.headers['ETag']
+        response = client.get('/api/docs', headers={**headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+def test_writes_invalidate_cached_reads(client):
+    """Test that organization writes refresh cached list, detail, stats and search responses"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+
+    def snapshot():
+        return (client.get('/api/organizations', headers=headers).get_json()['total'],
+                client.get('/api/stats', headers=headers).get_json()['organizations']['total'],
+                client.get('/api/search/advanced?q=zephyrine', headers=headers).get_json()['total'])
+
+    total, stats_total, found = snapshot()
+    response = client.post('/api/organizations', json={'name': 'Zephyrine Labs', 'type': 'test'}, headers=headers)
+    assert response.status_code == 201
+    org_id = response.get_json()['id']
+    assert snapshot() == (total + 1, stats_total + 1, found + 1)
+
+    assert client.get(f'/api/organizations/{org_id}', headers=headers).get_json()['name'] == 'Zephyrine Labs'
+    response = client.put(f'/api/organizations/{org_id}', json={'name': 'Quillon Labs'}, headers=headers)
+    assert response.status_code == 200
+    assert client.get(f'/api/organizations/{org_id}', headers=headers).get_json()['name'] == 'Quillon Labs'
+    assert snapshot() == (total + 1, stats_total + 1, found)
+
+    response = client.delete(f'/api/organizations/{org_id}', headers=headers)
+    assert response.status_code == 204
+    assert client.get(f'/api/organizations/{org_id}', headers=headers).status_code == 404
+    assert snapshot() == (total, stats_total, found)
+
+def test_writes_delete_superseded_cache_entries(client):
+    """Test that a write drops the cached responses built on the old data instead of stranding them"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    client.get('/api/profiles?page=3', headers=headers)
+    client.get('/api/stats', headers=headers)
+    cached = set(cache.cache._cache)
+    response = client.post('/api/profiles', json={'name': 'Cache Eviction'}, headers=headers)
+    assert response.status_code == 201
+    dropped = cached - set(cache.cache._cache)
+    assert any(isinstance(key, tuple) and key[0] == 'profiles' for key in dropped)
+    assert any(isinstance(key, str) and key.startswith('/api/stats_') for key in dropped)
+
+def test_threaded_list_reads_past_cache_threshold(client):
+    """Test that concurrent list reads stay healthy while every cache set prunes"""
+    headers = {'Authorization': 'Bearer ft_test_api_2024'}
+    for i in range(cache.cache._threshold + 1):
+        cache.set(('filler', i), b'', timeout=60)
+    statuses = []
+
+    def read(thread):
+        thread_client = app.test_client()
+        statuses.extend(thread_client.get(f'/api/users?page={i % 10 + 1}&name={thread}-{i}', headers=headers).status_code
+                        for i in range(100))
+
+    limiter.enabled = False
+    try:
+        threads = [threading.Thread(target=read, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        limiter.enabled = True
+    assert statuses == [200] * 800
+
 class TestAPI(unittest.TestCase):
     BASE_URL = "http://localhost:3000"
     HEADERS = {"Authorization": "Bearer ft_test_api_2024"}
 
+    @classmethod
+    def setUpClass(cls):
+        # Reuse one keep-alive connection pool for every live-server request
+        cls.session = requests.Session()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+
     def test_health_check(self):
-        response = requests.get(f"{self.BASE_URL}/api/health")
+        response = self.session.get(f"{self.BASE_URL}/api/health")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["status"], "healthy")
 
     def test_invalid_token(self):
         headers = {"Authorization": "Bearer invalid-token"}
-        response = requests.get(f"{self.BASE_URL}/api/organizations", headers=headers)
+        response = self.session.get(f"{self.BASE_URL}/api/organizations", headers=headers)
         self.assertEqual(response.status_code, 401)
 
     def test_organizations_endpoint(self):
-        response = requests.get(f"{self.BASE_URL}/api/organizations", headers=self.HEADERS)
+        response = self.session.get(f"{self.BASE_URL}/api/organizations", headers=self.HEADERS)
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertIn("items", data)
         self.assertIn("total", data)
 
     def test_users_endpoint(self):
-        response = requests.get(f"{self.BASE_URL}/api/users", headers=self.HEADERS)
+        response = self.session.get(f"{self.BASE_URL}/api/users", headers=self.HEADERS)
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertIn("items", data)
         self.assertIn("total", data)
 
     def test_profiles_endpoint(self):
-        response = requests.get(f"{self.BASE_URL}/api/profiles", headers=self.HEADERS)
+        response = self.session.get(f"{self.BASE_URL}/api/profiles", headers=self.HEADERS)
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertIn("items", data)
@@ -140,14 +300,14 @@ class TestAPI(unittest.TestCase):
     def test_rate_limiting(self):
         # This test might be flaky due to rate limiting reset
         for _ in range(5):
-            response = requests.get(f"{self.BASE_URL}/api/health")
+            response = self.session.get(f"{self.BASE_URL}/api/health")
             if response.status_code == 429:
                 break
         # Just check that the endpoint exists
         self.assertIn(response.status_code, [200, 429])
 
     def test_organizations_filtering(self):
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/organizations",
             headers=self.HEADERS,
             params={"name": "Organization 1"}
@@ -158,7 +318,7 @@ class TestAPI(unittest.TestCase):
         self.assertGreater(len(data["items"]), 0)
 
     def test_users_filtering(self):
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/users",
             headers=self.HEADERS,
             params={"organization_id": "ORG001"}
@@ -173,7 +333,7 @@ class TestAPI(unittest.TestCase):
     # Advanced Search Tests
     def test_advanced_search_basic(self):
         """Test basic advanced search without parameters"""
-        response = requests.get(f"{self.BASE_URL}/api/search/advanced", headers=self.HEADERS)
+        response = self.session.get(f"{self.BASE_URL}/api/search/advanced", headers=self.HEADERS)
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertIn("items", data)
@@ -184,7 +344,7 @@ class TestAPI(unittest.TestCase):
 
     def test_advanced_search_text_query(self):
         """Test text search functionality with 'q' parameter"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"q": "Organization 1", "type": "organizations", "per_page": 5}
@@ -204,7 +364,7 @@ class TestAPI(unittest.TestCase):
     def test_advanced_search_type_filtering(self):
         """Test entity type filtering"""
         # Test organizations only
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"type": "organizations", "per_page": 5}
@@ -216,7 +376,7 @@ class TestAPI(unittest.TestCase):
             self.assertEqual(item["type"], "organization")
 
         # Test users only
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"type": "users", "per_page": 5}
@@ -230,7 +390,7 @@ class TestAPI(unittest.TestCase):
     def test_advanced_search_filters_basic(self):
         """Test basic filtering with filters parameter"""
         filters = {"name": "Organization 1"}
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={
@@ -250,7 +410,7 @@ class TestAPI(unittest.TestCase):
     def test_advanced_search_nested_filters(self):
         """Test nested field filtering using dot notation"""
         filters = {"metadata.version": "1.0.0"}
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={
@@ -270,7 +430,7 @@ class TestAPI(unittest.TestCase):
     def test_advanced_search_combined(self):
         """Test combining text search and filters"""
         filters = {"organization_id": "ORG001"}
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={
@@ -292,7 +452,7 @@ class TestAPI(unittest.TestCase):
 
     def test_advanced_search_pagination(self):
         """Test pagination parameters"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"type": "all", "page": 1, "per_page": 5}
@@ -306,9 +466,40 @@ class TestAPI(unittest.TestCase):
         self.assertGreater(data["total"], 0)
         self.assertGreater(data["total_pages"], 0)
 
+    def test_advanced_search_cursor_pagination(self):
+        """Test keyset pagination with the 'cursor' parameter"""
+        params = {"type": "organizations", "per_page": 3, "cursor": ""}
+        seen = []
+        while True:
+            response = self.session.get(
+                f"{self.BASE_URL}/api/search/advanced",
+                headers=self.HEADERS,
+                params=params
+            )
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data["items"]), 3)
+            seen.extend(item["id"] for item in data["items"])
+            if not data["next_cursor"]:
+                break
+            params["cursor"] = data["next_cursor"]
+        
+        # Every organization appears exactly once, in id order
+        self.assertGreater(len(seen), 3)
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_advanced_search_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = self.session.get(
+            f"{self.BASE_URL}/api/search/advanced",
+            headers=self.HEADERS,
+            params={"cursor": "not-a-cursor"}
+        )
+        self.assertEqual(response.status_code, 400)
+
     def test_advanced_search_invalid_filters(self):
         """Test handling of invalid JSON in filters parameter"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"filters": "invalid-json"}
@@ -318,7 +509,7 @@ class TestAPI(unittest.TestCase):
 
     def test_advanced_search_empty_results(self):
         """Test search that returns no results"""
-        response = requests.get(
+        response = self.session.get(
             f"{self.BASE_URL}/api/search/advanced",
             headers=self.HEADERS,
             params={"q": "NonexistentSearchTerm12345"}